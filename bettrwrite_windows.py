@@ -4,42 +4,176 @@ bettrWrite for Windows
 A tool to process selected text using AI models via keyboard shortcuts
 """
 
-import json
+import asyncio
 import time
 import sys
 import os
+import hashlib
+import sqlite3
+import threading
+import queue
+import ctypes
+from ctypes import wintypes
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Any, List, Optional, Set, Tuple
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import atexit
 from datetime import datetime
 
 import keyboard
-import pyperclip
-import pyautogui
-import requests
-from plyer import notification
+import orjson
+
+# httpx and plyer are imported on first use to keep startup fast
+if TYPE_CHECKING:
+    import httpx
 
 # Configure logging
 LOG_DIR = Path.home() / "bettrwrite_logs"
 LOG_DIR.mkdir(exist_ok=True)
 LOG_FILE = LOG_DIR / "bettrwrite.log"
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+# Records are written by a listener thread so hotkey handlers never block on I/O.
+# The console handler is skipped when there is no terminal (silent VBS launch).
+log_handlers = [logging.FileHandler(LOG_FILE)]
+if sys.stderr and sys.stderr.isatty():
+    log_handlers.append(logging.StreamHandler())
+log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
+
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(log_queue, *log_handlers)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+# The queue handler only renders the message (and any traceback); the
+# timestamp and level are added by the listener's handlers
+queue_handler = QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
 logger = logging.getLogger(__name__)
 
 # Configuration paths
 CONFIG_DIR = Path.home() / ".config" / "bettrwrite"
 CONFIG_FILE = CONFIG_DIR / "config.json"
+CACHE_FILE = CONFIG_DIR / "cache.db"
+
+# Backend defaults
+BACKENDS = ("openai", "ollama")
+DEFAULT_OPENAI_MODEL = "gpt-4o"
+DEFAULT_OLLAMA_URL = "http://localhost:11434"
+
+# Keep Ollama models loaded indefinitely instead of unloading after 5 minutes idle
+OLLAMA_KEEP_ALIVE = -1
+# How long quitting waits for Ollama to unload the warmed-up models
+OLLAMA_UNLOAD_TIMEOUT = 2
+
+# Digest size for cache and in-flight request keys (not used for security)
+KEY_DIGEST_SIZE = 16
+
+# Response cache defaults
+CACHE_TTL = 7 * 24 * 60 * 60
+CACHE_MAX_TEMPERATURE = 0.3
+SEMANTIC_THRESHOLD = 0.92
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# HTTP connection pool and retry policy for API calls
+HTTP_POOL_SIZE = 4
+HTTP_TIMEOUT = 60
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_RETRIES = 2
+HTTP_BACKOFF = 0.3
+HTTP_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Maximum number of rewrites processed concurrently
+MAX_INFLIGHT = 4
+
+# Ignore repeat presses of the same shortcut within this many seconds
+DEBOUNCE_INTERVAL = 0.3
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+user32 = ctypes.WinDLL("user32", use_last_error=True)
+kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
 
-# Fail-safe to prevent infinite loops
-pyautogui.FAILSAFE = True
+# Clipboard change detection
+CLIPBOARD_POLL_INTERVAL = 0.002
+CLIPBOARD_TIMEOUT = 0.5
+PASTE_SETTLE_DELAY = 0.1
+
+# Replacements shorter than this are typed instead of pasted via the clipboard
+TYPE_THRESHOLD = 500
+
+# SendInput keyboard events
+INPUT_KEYBOARD = 1
+KEYEVENTF_KEYUP = 0x0002
+MAPVK_VK_TO_VSC = 0
+VK_CONTROL = 0x11
+
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", wintypes.WORD),
+        ("wScan", wintypes.WORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", wintypes.WPARAM)
+    ]
+
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ("dx", wintypes.LONG),
+        ("dy", wintypes.LONG),
+        ("mouseData", wintypes.DWORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", wintypes.WPARAM)
+    ]
+
+
+class HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [
+        ("uMsg", wintypes.DWORD),
+        ("wParamL", wintypes.WORD),
+        ("wParamH", wintypes.WORD)
+    ]
+
+
+class INPUT(ctypes.Structure):
+    class _INPUT(ctypes.Union):
+        # The mouse/hardware members are only here so sizeof(INPUT) matches Win32
+        _fields_ = [("ki", KEYBDINPUT), ("mi", MOUSEINPUT), ("hi", HARDWAREINPUT)]
+    
+    _anonymous_ = ("_input",)
+    _fields_ = [("type", wintypes.DWORD), ("_input", _INPUT)]
+
+
+user32.SendInput.argtypes = (wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int)
+user32.SendInput.restype = wintypes.UINT
+
+
+def key_input(vk: int, flags: int = 0) -> INPUT:
+    """Build a keyboard INPUT event for a virtual key"""
+    scan = user32.MapVirtualKeyW(vk, MAPVK_VK_TO_VSC)
+    return INPUT(type=INPUT_KEYBOARD, ki=KEYBDINPUT(wVk=vk, wScan=scan, dwFlags=flags))
+
+
+def send_ctrl_combo(key: str):
+    """Press Ctrl+<key> with a single SendInput call"""
+    vk = ord(key.upper())
+    events = (INPUT * 4)(
+        key_input(VK_CONTROL),
+        key_input(vk),
+        key_input(vk, KEYEVENTF_KEYUP),
+        key_input(VK_CONTROL, KEYEVENTF_KEYUP)
+    )
+    if user32.SendInput(len(events), events, ctypes.sizeof(INPUT)) != len(events):
+        raise ctypes.WinError(ctypes.get_last_error())
 
 
 class BettrWriteError(Exception):
@@ -47,12 +181,529 @@ class BettrWriteError(Exception):
     pass
 
 
+# Win32 clipboard access
+CF_UNICODETEXT = 13
+GMEM_MOVEABLE = 0x0002
+HWND_MESSAGE = -3
+
+user32.CreateWindowExW.argtypes = (
+    wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD,
+    ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+    wintypes.HWND, wintypes.HMENU, wintypes.HINSTANCE, wintypes.LPVOID
+)
+user32.CreateWindowExW.restype = wintypes.HWND
+user32.GetMessageW.argtypes = (ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT)
+user32.GetMessageW.restype = wintypes.BOOL
+user32.DispatchMessageW.argtypes = (ctypes.POINTER(wintypes.MSG),)
+user32.DispatchMessageW.restype = ctypes.c_ssize_t
+user32.GetForegroundWindow.restype = wintypes.HWND
+user32.OpenClipboard.argtypes = (wintypes.HWND,)
+user32.OpenClipboard.restype = wintypes.BOOL
+user32.CloseClipboard.restype = wintypes.BOOL
+user32.EmptyClipboard.restype = wintypes.BOOL
+user32.GetClipboardData.argtypes = (wintypes.UINT,)
+user32.GetClipboardData.restype = wintypes.HANDLE
+user32.SetClipboardData.argtypes = (wintypes.UINT, wintypes.HANDLE)
+user32.SetClipboardData.restype = wintypes.HANDLE
+kernel32.GlobalAlloc.argtypes = (wintypes.UINT, ctypes.c_size_t)
+kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+kernel32.GlobalLock.argtypes = (wintypes.HGLOBAL,)
+kernel32.GlobalLock.restype = wintypes.LPVOID
+kernel32.GlobalUnlock.argtypes = (wintypes.HGLOBAL,)
+kernel32.GlobalUnlock.restype = wintypes.BOOL
+kernel32.GlobalFree.argtypes = (wintypes.HGLOBAL,)
+kernel32.GlobalFree.restype = wintypes.HGLOBAL
+
+
+clipboard_window_lock = threading.Lock()
+clipboard_window_handle = None
+
+
+def run_clipboard_window(ready: queue.Queue):
+    """Create a message-only window and answer its messages until the process exits"""
+    hwnd = user32.CreateWindowExW(0, "STATIC", None, 0, 0, 0, 0, 0, HWND_MESSAGE, None, None, None)
+    ready.put((hwnd, ctypes.get_last_error()))
+    if not hwnd:
+        return
+    
+    msg = wintypes.MSG()
+    while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+        user32.DispatchMessageW(ctypes.byref(msg))
+
+
+def clipboard_window() -> int:
+    """Return the window that owns clipboard contents we set, creating it on first use
+    
+    SetClipboardData fails unless the clipboard was opened with a window. It runs
+    on its own thread so messages other applications send the clipboard owner
+    are always answered.
+    """
+    global clipboard_window_handle
+    with clipboard_window_lock:
+        if clipboard_window_handle is None:
+            ready = queue.Queue()
+            threading.Thread(target=run_clipboard_window, args=(ready,), daemon=True).start()
+            hwnd, error = ready.get()
+            if not hwnd:
+                raise ctypes.WinError(error)
+            clipboard_window_handle = hwnd
+        return clipboard_window_handle
+
+
+@contextmanager
+def open_clipboard(timeout: float = CLIPBOARD_TIMEOUT):
+    """Open the clipboard, retrying while another application holds it"""
+    hwnd = clipboard_window()
+    deadline = time.monotonic() + timeout
+    while not user32.OpenClipboard(hwnd):
+        if time.monotonic() >= deadline:
+            raise ctypes.WinError(ctypes.get_last_error())
+        time.sleep(CLIPBOARD_POLL_INTERVAL)
+    try:
+        yield
+    finally:
+        user32.CloseClipboard()
+
+
+def clipboard_get() -> str:
+    """Read Unicode text from the clipboard"""
+    with open_clipboard():
+        handle = user32.GetClipboardData(CF_UNICODETEXT)
+        if not handle:
+            return ""
+        pointer = kernel32.GlobalLock(handle)
+        if not pointer:
+            return ""
+        try:
+            return ctypes.wstring_at(pointer)
+        finally:
+            kernel32.GlobalUnlock(handle)
+
+
+def clipboard_set(text: str):
+    """Replace the clipboard contents with Unicode text"""
+    data = ctypes.create_unicode_buffer(text)
+    size = ctypes.sizeof(data)
+    handle = kernel32.GlobalAlloc(GMEM_MOVEABLE, size)
+    if not handle:
+        raise ctypes.WinError(ctypes.get_last_error())
+    
+    pointer = kernel32.GlobalLock(handle)
+    if not pointer:
+        error = ctypes.get_last_error()
+        kernel32.GlobalFree(handle)
+        raise ctypes.WinError(error)
+    ctypes.memmove(pointer, data, size)
+    kernel32.GlobalUnlock(handle)
+    
+    # The clipboard owns the memory once SetClipboardData succeeds
+    try:
+        with open_clipboard():
+            user32.EmptyClipboard()
+            if not user32.SetClipboardData(CF_UNICODETEXT, handle):
+                raise ctypes.WinError(ctypes.get_last_error())
+    except Exception:
+        kernel32.GlobalFree(handle)
+        raise
+
+
+def wait_for_clipboard_change(sequence: int, timeout: float = CLIPBOARD_TIMEOUT) -> bool:
+    """Wait until the clipboard sequence number moves past the given value"""
+    deadline = time.monotonic() + timeout
+    while user32.GetClipboardSequenceNumber() == sequence:
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(CLIPBOARD_POLL_INTERVAL)
+    return True
+
+
+def config_value(data: Dict[str, Any], name: str, kind, default, where: str):
+    """Read an optional config value, checking its JSON type"""
+    value = data.get(name)
+    if value is None:
+        return default
+    
+    kinds = kind if isinstance(kind, tuple) else (kind,)
+    # JSON true/false load as bool, which is also an int in Python
+    if not isinstance(value, kinds) or (isinstance(value, bool) and bool not in kinds):
+        expected = " or ".join(k.__name__ for k in kinds)
+        raise BettrWriteError(f"{where}: '{name}' must be of type {expected}")
+    return value
+
+
+@dataclass(frozen=True)
+class CacheSettings:
+    """The settings.cache section of config.json"""
+    enabled: bool = True
+    ttl_seconds: float = CACHE_TTL
+    semantic: bool = False
+    semantic_threshold: float = SEMANTIC_THRESHOLD
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CacheSettings":
+        where = "settings.cache"
+        return cls(
+            enabled=config_value(data, "enabled", bool, True, where),
+            ttl_seconds=config_value(data, "ttl_seconds", (int, float), CACHE_TTL, where),
+            semantic=config_value(data, "semantic", bool, False, where),
+            semantic_threshold=config_value(data, "semantic_threshold", (int, float), SEMANTIC_THRESHOLD, where)
+        )
+
+
+@dataclass(frozen=True)
+class Settings:
+    """The settings section of config.json"""
+    openai_api_key: Optional[str] = None
+    ollama_base_url: str = DEFAULT_OLLAMA_URL
+    cache: CacheSettings = field(default_factory=CacheSettings)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Settings":
+        where = "settings"
+        return cls(
+            openai_api_key=config_value(data, "openai_api_key", str, None, where),
+            ollama_base_url=config_value(data, "ollama_base_url", str, DEFAULT_OLLAMA_URL, where),
+            cache=CacheSettings.from_dict(config_value(data, "cache", dict, {}, where))
+        )
+
+
+@dataclass(frozen=True)
+class ShortcutConfig:
+    """A validated shortcut entry, with its request template prebuilt"""
+    id: str
+    keys: str
+    backend: str = "openai"
+    model: str = ""
+    prompt: str = ""
+    stream: bool = False
+    paste: bool = False
+    cache: Optional[bool] = None
+    openai_options: Dict[str, Any] = field(default_factory=dict)
+    ollama_options: Dict[str, Any] = field(default_factory=dict)
+    
+    # Derived from the fields above in __post_init__
+    options: Dict[str, Any] = field(init=False, repr=False, compare=False)
+    request_template: Dict[str, Any] = field(init=False, repr=False, compare=False)
+    prompt_prefix: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        if self.backend not in BACKENDS:
+            raise BettrWriteError(f"Shortcut '{self.id}': unknown backend '{self.backend}'")
+        if not self.model and self.backend == "openai":
+            object.__setattr__(self, "model", DEFAULT_OPENAI_MODEL)
+        
+        options = self.openai_options if self.backend == "openai" else self.ollama_options
+        object.__setattr__(self, "options", options)
+        
+        # Everything in the request except the selected text
+        if self.backend == "openai":
+            template = {
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": self.prompt},
+                    {"role": "user", "content": None}
+                ],
+                **options,
+                "stream": True
+            }
+        else:
+            template = {
+                "model": self.model,
+                "prompt": None,
+                "keep_alive": OLLAMA_KEEP_ALIVE,
+                **options,
+                "stream": True
+            }
+        object.__setattr__(self, "request_template", template)
+        object.__setattr__(self, "prompt_prefix", f"{self.prompt}\n\nText to process:\n")
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], index: int) -> "ShortcutConfig":
+        where = f"Shortcut #{index}"
+        if not isinstance(data, dict):
+            raise BettrWriteError(f"{where} must be a JSON object")
+        for name in ("id", "keys"):
+            if not config_value(data, name, str, "", where).strip():
+                raise BettrWriteError(f"{where}: '{name}' is required")
+        
+        return cls(
+            id=data["id"],
+            keys=data["keys"],
+            backend=config_value(data, "backend", str, "openai", where),
+            model=config_value(data, "model", str, "", where),
+            prompt=config_value(data, "prompt", str, "", where),
+            stream=config_value(data, "stream", bool, False, where),
+            paste=config_value(data, "paste", bool, False, where),
+            cache=config_value(data, "cache", bool, None, where),
+            openai_options=config_value(data, "openai_options", dict, {}, where),
+            ollama_options=config_value(data, "ollama_options", dict, {}, where)
+        )
+
+
+@dataclass(frozen=True)
+class Config:
+    """The validated contents of config.json"""
+    settings: Settings
+    shortcuts: Tuple[ShortcutConfig, ...]
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Config":
+        if not isinstance(data, dict):
+            raise BettrWriteError("Configuration must be a JSON object")
+        
+        settings = Settings.from_dict(config_value(data, "settings", dict, {}, "config"))
+        entries: List[Any] = config_value(data, "shortcuts", list, [], "config")
+        shortcuts = tuple(ShortcutConfig.from_dict(entry, i) for i, entry in enumerate(entries, 1))
+        
+        ids = [shortcut.id for shortcut in shortcuts]
+        duplicates = sorted({sid for sid in ids if ids.count(sid) > 1})
+        if duplicates:
+            raise BettrWriteError(f"Duplicate shortcut ids: {', '.join(duplicates)}")
+        return cls(settings, shortcuts)
+
+
+class ResponseCache:
+    """On-disk cache of processed text, with an optional semantic lookup tier"""
+
+    def __init__(self, path: Path, ttl: float = CACHE_TTL, semantic: bool = False,
+                 threshold: float = SEMANTIC_THRESHOLD):
+        self.ttl = ttl
+        self.threshold = threshold
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                scope TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                created REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS embeddings_scope ON embeddings (scope);
+        """)
+        self.purge_expired()
+        # Loading the embedder imports torch and may download the model, so
+        # it happens on the first lookup rather than holding up startup
+        self.semantic = semantic
+        self.embedder = None
+        self.embedder_lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(shortcut_id: str, config: ShortcutConfig, text: Optional[str]) -> str:
+        """Hash everything that influences the response into a cache key"""
+        key_data = {
+            "sid": shortcut_id,
+            "model": config.model,
+            "prompt": config.prompt,
+            "text": text,
+            "opts": config.options
+        }
+        key_bytes = orjson.dumps(key_data, option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(key_bytes, digest_size=KEY_DIGEST_SIZE).hexdigest()
+    
+    @staticmethod
+    def is_cacheable(config: ShortcutConfig) -> bool:
+        """Only near-deterministic shortcuts are cached unless explicitly configured"""
+        if config.cache is not None:
+            return config.cache
+        temperature = config.options.get("temperature")
+        return isinstance(temperature, (int, float)) and temperature < CACHE_MAX_TEMPERATURE
+    
+    def load_embedder(self):
+        """Load the local sentence embedder used by the semantic tier"""
+        try:
+            import numpy
+            from sentence_transformers import SentenceTransformer
+            self.np = numpy
+            model = SentenceTransformer(EMBEDDING_MODEL)
+            logger.info(f"Semantic cache enabled using {EMBEDDING_MODEL}")
+            return model
+        except Exception as e:
+            logger.error(f"Semantic cache disabled, failed to load embedder: {e}")
+            return None
+    
+    def get_embedder(self):
+        """Return the semantic tier's embedder, loading it on first use"""
+        with self.embedder_lock:
+            if self.semantic and self.embedder is None:
+                self.embedder = self.load_embedder()
+                self.semantic = self.embedder is not None
+            return self.embedder
+    
+    def embed(self, text: str):
+        """Embed text as a normalized float32 vector"""
+        vector = self.embedder.encode(text, normalize_embeddings=True)
+        return self.np.asarray(vector, dtype=self.np.float32)
+    
+    def purge_expired(self):
+        """Drop entries older than the TTL"""
+        cutoff = time.time() - self.ttl
+        with self.lock:
+            self.conn.execute("DELETE FROM cache WHERE created < ?", (cutoff,))
+            self.conn.execute("DELETE FROM embeddings WHERE created < ?", (cutoff,))
+            self.conn.commit()
+    
+    def get(self, key: str, scope: str, text: str) -> Tuple[Optional[str], Optional[bytes]]:
+        """Look up a response by exact key or semantic similarity, plus any embedding computed"""
+        cutoff = time.time() - self.ttl
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT response FROM cache WHERE key = ? AND created >= ?", (key, cutoff)
+            ).fetchone()
+        if row:
+            logger.info("Cache hit (exact)")
+            return row[0], None
+        
+        if not self.get_embedder():
+            return None, None
+        
+        query = self.embed(text)
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT key, vector FROM embeddings WHERE scope = ? AND created >= ?", (scope, cutoff)
+            ).fetchall()
+        if not rows:
+            return None, query.tobytes()
+        
+        matrix = self.np.stack([self.np.frombuffer(vector, dtype=self.np.float32) for _, vector in rows])
+        scores = matrix @ query
+        best = int(scores.argmax())
+        if scores[best] < self.threshold:
+            return None, query.tobytes()
+        
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT response FROM cache WHERE key = ? AND created >= ?", (rows[best][0], cutoff)
+            ).fetchone()
+        if row:
+            logger.info(f"Cache hit (semantic, similarity {scores[best]:.3f})")
+            return row[0], None
+        return None, query.tobytes()
+    
+    def put(self, key: str, scope: str, vector: Optional[bytes], response: str):
+        """Store a response, and its input embedding (from get) when there is one"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache (key, response, created) VALUES (?, ?, ?)",
+                (key, response, now)
+            )
+            if vector is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, scope, vector, created) VALUES (?, ?, ?, ?)",
+                    (key, scope, vector, now)
+                )
+            self.conn.commit()
+
+
+async def split_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines without decoding it to str"""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        with memoryview(buffer) as view:
+            while (end := buffer.find(b"\n", start)) != -1:
+                # Tolerate CRLF line endings from SSE servers
+                line_end = end - 1 if end > start and buffer[end - 1] == 0x0D else end
+                yield bytes(view[start:line_end])
+                start = end + 1
+        # Drop consumed lines once per chunk rather than once per line
+        del buffer[:start]
+    
+    if buffer:
+        yield bytes(buffer)
+
+
+async def strip_stream(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Strip leading and trailing whitespace from a stream of text chunks"""
+    started = False
+    pending = ""
+    async for chunk in chunks:
+        if not started:
+            chunk = chunk.lstrip()
+            if not chunk:
+                continue
+            started = True
+        
+        content = chunk.rstrip()
+        if content:
+            yield pending + content
+            pending = chunk[len(content):]
+        else:
+            pending += chunk
+
+
+class CachedBackend:
+    """Dispatch a shortcut to its API backend, serving repeats from the response cache"""
+
+    def __init__(self, backends: Dict[str, Callable[[str, ShortcutConfig], AsyncIterator[str]]],
+                 cache: Optional[ResponseCache] = None):
+        self.backends = backends
+        self.cache = cache
+    
+    async def stream(self, shortcut_id: str, text: str, config: ShortcutConfig) -> AsyncIterator[str]:
+        """Yield the processed text for a shortcut as it is generated"""
+        call = self.backends.get(config.backend)
+        if not call:
+            raise BettrWriteError(f"Unknown backend: {config.backend}")
+        
+        if not self.cache or not ResponseCache.is_cacheable(config):
+            async for chunk in strip_stream(call(text, config)):
+                yield chunk
+            return
+        
+        # Cache lookups can embed text, so keep them off the event loop
+        loop = asyncio.get_running_loop()
+        key = ResponseCache.make_key(shortcut_id, config, text)
+        scope = ResponseCache.make_key(shortcut_id, config, None)
+        vector = None
+        try:
+            cached, vector = await loop.run_in_executor(None, self.cache.get, key, scope, text)
+            if cached is not None:
+                yield cached
+                return
+        except Exception as e:
+            logger.error(f"Cache lookup failed: {e}")
+        
+        parts = []
+        async for chunk in strip_stream(call(text, config)):
+            parts.append(chunk)
+            yield chunk
+        
+        try:
+            await loop.run_in_executor(None, self.cache.put, key, scope, vector, "".join(parts))
+        except Exception as e:
+            logger.error(f"Failed to store response in cache: {e}")
+    
+    async def complete(self, shortcut_id: str, text: str, config: ShortcutConfig) -> str:
+        """Return the processed text for a shortcut"""
+        return "".join([chunk async for chunk in self.stream(shortcut_id, text, config)])
+
+
 class BettrWrite:
     def __init__(self):
-        self.config = {}
-        self.original_clipboard = ""
+        self.config: Optional[Config] = None
+        self._notify = None
+        self.shortcut_map: Dict[str, ShortcutConfig] = {}
+        self._last_fire: Dict[str, float] = {}
+        self._inflight: Set[Tuple[str, bytes]] = set()
+        self._captures = 0
+        self.warm_models: List[str] = []
+        self.openai_headers = None
+        self.ollama_url = ""
         self.load_config()
+        self.backend = CachedBackend(
+            {"openai": self.call_openai_api, "ollama": self.call_ollama_api},
+            self.open_cache()
+        )
+        self.start_event_loop()
         self.setup_hotkeys()
+        self.warm_up_ollama()
         
     def load_config(self):
         """Load configuration from JSON file"""
@@ -62,18 +713,78 @@ class BettrWrite:
             sys.exit(1)
             
         try:
-            with open(CONFIG_FILE, 'r') as f:
-                self.config = json.load(f)
+            with open(CONFIG_FILE, 'rb') as f:
+                self.config = Config.from_dict(orjson.loads(f.read()))
             logger.info("Configuration loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load configuration: {e}")
             self.show_notification("Error", f"Failed to load config: {str(e)}")
             sys.exit(1)
+        
+        # Index shortcuts by id so hotkey dispatch is a single lookup
+        self.shortcut_map = {shortcut.id: shortcut for shortcut in self.config.shortcuts}
+        
+        settings = self.config.settings
+        self.ollama_url = f"{settings.ollama_base_url}/api/generate"
+        
+        api_key = os.getenv("OPENAI_API_KEY") or settings.openai_api_key
+        if api_key and api_key != "YOUR_OPENAI_API_KEY_OR_NULL":
+            self.openai_headers = {**JSON_HEADERS, "Authorization": f"Bearer {api_key}"}
+    
+    def start_event_loop(self):
+        """Run an asyncio event loop in the background for API calls"""
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self.setup_async(), self.loop).result()
+    
+    async def setup_async(self):
+        """Create the objects that must belong to the background event loop"""
+        self.rewrite_slots = asyncio.Semaphore(MAX_INFLIGHT)
+        self.output_lock = asyncio.Lock()
+        self.client = None
+        
+        # Import httpx on the loop thread while hotkeys are being registered
+        self.loop.call_soon(self.get_client)
+    
+    def get_client(self) -> "httpx.AsyncClient":
+        """Create the shared HTTP client on first use"""
+        if self.client is None:
+            import httpx
+            limits = httpx.Limits(
+                max_connections=HTTP_POOL_SIZE,
+                max_keepalive_connections=HTTP_POOL_SIZE
+            )
+            self.client = httpx.AsyncClient(
+                transport=httpx.AsyncHTTPTransport(http2=True, limits=limits, retries=HTTP_RETRIES),
+                timeout=HTTP_TIMEOUT
+            )
+        return self.client
+    
+    def open_cache(self) -> Optional[ResponseCache]:
+        """Open the response cache configured in settings"""
+        cache_settings = self.config.settings.cache
+        if not cache_settings.enabled:
+            logger.info("Response cache disabled")
+            return None
+        
+        try:
+            return ResponseCache(
+                CACHE_FILE,
+                ttl=cache_settings.ttl_seconds,
+                semantic=cache_settings.semantic,
+                threshold=cache_settings.semantic_threshold
+            )
+        except Exception as e:
+            logger.error(f"Failed to open response cache: {e}")
+            return None
     
     def show_notification(self, title: str, message: str, timeout: int = 5):
         """Show Windows notification"""
         try:
-            notification.notify(
+            if self._notify is None:
+                from plyer import notification
+                self._notify = notification.notify
+            self._notify(
                 title=f"bettrWrite - {title}",
                 message=message,
                 timeout=timeout,
@@ -82,195 +793,370 @@ class BettrWrite:
         except Exception as e:
             logger.error(f"Failed to show notification: {e}")
     
-    def save_clipboard(self):
-        """Save current clipboard content"""
+    def notify_in_background(self, title: str, message: str, timeout: int = 5):
+        """Show a notification without blocking the caller"""
+        # plyer's balloon tip blocks for the whole timeout, so keep it off the
+        # executor that types text and talks to the cache
+        threading.Thread(
+            target=self.show_notification, args=(title, message, timeout), daemon=True
+        ).start()
+    
+    @staticmethod
+    def save_clipboard() -> str:
+        """Return current clipboard content"""
         try:
-            self.original_clipboard = pyperclip.paste()
+            return clipboard_get()
         except Exception:
-            self.original_clipboard = ""
+            return ""
     
-    def restore_clipboard(self):
-        """Restore original clipboard content"""
+    @staticmethod
+    def restore_clipboard(saved: str):
+        """Restore clipboard content returned by save_clipboard"""
         try:
-            if self.original_clipboard:
-                pyperclip.copy(self.original_clipboard)
+            if saved:
+                clipboard_set(saved)
         except Exception as e:
             logger.error(f"Failed to restore clipboard: {e}")
     
     def get_selected_text(self) -> Optional[str]:
         """Get currently selected text via clipboard"""
+        saved = ""
         try:
             # Save current clipboard
-            self.save_clipboard()
-            
-            # Clear clipboard to detect if copy worked
-            pyperclip.copy("")
+            saved = self.save_clipboard()
             
             # Simulate Ctrl+C to copy selected text
-            pyautogui.hotkey('ctrl', 'c')
+            sequence = user32.GetClipboardSequenceNumber()
+            send_ctrl_combo('c')
             
-            # Wait for clipboard to update
-            time.sleep(0.1)
+            # If the clipboard never changes, no text was selected
+            if not wait_for_clipboard_change(sequence):
+                return None
             
-            # Get the selected text
-            selected_text = pyperclip.paste()
+            # Get the selected text, then put the clipboard back right away
+            # since another shortcut may capture before this one finishes
+            selected_text = clipboard_get()
+            self.restore_clipboard(saved)
             
-            # If clipboard is still empty, no text was selected
-            if not selected_text:
-                self.restore_clipboard()
-                return None
-                
-            return selected_text
+            return selected_text or None
             
         except Exception as e:
             logger.error(f"Failed to get selected text: {e}")
-            self.restore_clipboard()
+            self.restore_clipboard(saved)
             return None
     
-    def replace_selected_text(self, new_text: str):
+    def replace_selected_text(self, new_text: str, paste: bool = False):
         """Replace selected text with new text"""
+        # Short text is typed straight over the selection, leaving the clipboard alone.
+        # Newlines and tabs are typed as Enter and Tab keypresses, so that text is pasted.
+        if (not paste and len(new_text) < TYPE_THRESHOLD
+                and "\n" not in new_text and "\t" not in new_text):
+            try:
+                keyboard.write(new_text, delay=0)
+                return
+            except Exception as e:
+                logger.error(f"Failed to replace text: {e}")
+                raise BettrWriteError(f"Failed to replace text: {str(e)}")
+        
+        saved = ""
         try:
-            # Copy new text to clipboard
-            pyperclip.copy(new_text)
+            # Save current clipboard
+            saved = self.save_clipboard()
             
-            # Small delay to ensure clipboard is ready
-            time.sleep(0.05)
+            # Copy new text to clipboard
+            clipboard_set(new_text)
             
             # Paste the new text
-            pyautogui.hotkey('ctrl', 'v')
+            send_ctrl_combo('v')
             
-            # Restore original clipboard after a delay
-            time.sleep(0.1)
-            self.restore_clipboard()
+            # Reading the clipboard doesn't bump its sequence number, so give
+            # the target app time to paste before restoring, off this thread.
+            # The saved value is bound now so a capture in the meantime can't change it.
+            threading.Timer(PASTE_SETTLE_DELAY, self.restore_clipboard, (saved,)).start()
             
         except Exception as e:
             logger.error(f"Failed to replace text: {e}")
-            self.restore_clipboard()
+            self.restore_clipboard(saved)
             raise BettrWriteError(f"Failed to replace text: {str(e)}")
     
-    def call_openai_api(self, text: str, config: Dict[str, Any]) -> str:
-        """Call OpenAI API"""
-        api_key = os.getenv("OPENAI_API_KEY") or self.config.get("settings", {}).get("openai_api_key")
+    def is_current_target(self, target: Tuple[int, Optional[int]]) -> bool:
+        """Check that no newer capture happened and the captured window still has focus"""
+        return target == (self._captures, user32.GetForegroundWindow())
+    
+    async def divert_output(self, text: str):
+        """Copy a result whose selection is gone to the clipboard instead of typing it"""
+        await self.loop.run_in_executor(None, clipboard_set, text)
+        raise BettrWriteError("Selection changed before the rewrite finished; result copied to clipboard")
+    
+    def write_tokens(self, tokens: queue.Queue, target: Tuple[int, Optional[int]]) -> bool:
+        """Type queued tokens until the end-of-stream marker arrives
         
-        if not api_key or api_key == "YOUR_OPENAI_API_KEY_OR_NULL":
-            raise BettrWriteError("OpenAI API key not configured")
+        Returns False if the target changed, in which case typing stops and the rest is drained.
+        """
+        on_target = True
+        while True:
+            token = tokens.get()
+            if token is None:
+                return on_target
+            if on_target and not self.is_current_target(target):
+                logger.warning("Focus or selection changed, stopped typing")
+                on_target = False
+            if not on_target:
+                continue
+            try:
+                keyboard.write(token, delay=0)
+            except Exception as e:
+                logger.error(f"Failed to type text: {e}")
+    
+    async def type_stream(self, chunks: AsyncIterator[str], target: Tuple[int, Optional[int]], original: str):
+        """Type streamed text over the current selection as it arrives"""
+        tokens = queue.Queue()
+        parts = []
         
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}"
-        }
+        async def pump():
+            try:
+                async for chunk in chunks:
+                    parts.append(chunk)
+                    tokens.put(chunk)
+            finally:
+                tokens.put(None)
         
-        payload = {
-            "model": config.get("model", "gpt-4o"),
-            "messages": [
-                {"role": "system", "content": config.get("prompt", "")},
-                {"role": "user", "content": text}
-            ],
-            **config.get("openai_options", {})
-        }
+        # Keep generating while an earlier rewrite is still being typed,
+        # but only let one rewrite type at a time
+        producer = asyncio.ensure_future(pump())
+        async with self.output_lock:
+            on_target = await self.loop.run_in_executor(None, self.write_tokens, tokens, target)
+        try:
+            await producer
+        except Exception as e:
+            if not parts:
+                raise
+            # Part of the response has already replaced the selection, so keep
+            # the original text where the user can paste it back
+            logger.error(f"Stream interrupted: {e}")
+            await self.loop.run_in_executor(None, clipboard_set, original)
+            raise BettrWriteError(f"Response interrupted, output is incomplete; original text copied to clipboard ({e})")
+        if not on_target:
+            await self.divert_output("".join(parts))
+    
+    async def post_stream(self, url: str, headers: Dict[str, str], payload: Dict[str, Any],
+                          timeout: float) -> "httpx.Response":
+        """POST a JSON payload and open a streamed response, retrying transient errors"""
+        import httpx
+        
+        client = self.get_client()
+        content = orjson.dumps(payload)
+        timeouts = httpx.Timeout(timeout, connect=HTTP_CONNECT_TIMEOUT)
+        for attempt in range(HTTP_RETRIES + 1):
+            request = client.build_request(
+                "POST", url, headers=headers, content=content, timeout=timeouts
+            )
+            response = await client.send(request, stream=True)
+            if response.status_code in HTTP_RETRY_STATUSES and attempt < HTTP_RETRIES:
+                await response.aclose()
+                await asyncio.sleep(HTTP_BACKOFF * 2 ** attempt)
+                continue
+            
+            if response.is_error:
+                await response.aread()
+                await response.aclose()
+            response.raise_for_status()
+            return response
+    
+    async def call_openai_api(self, text: str, config: ShortcutConfig) -> AsyncIterator[str]:
+        """Call OpenAI API, yielding content deltas as they stream in"""
+        import httpx
+        
+        if not self.openai_headers:
+            raise BettrWriteError("OpenAI API key not configured")
+        
+        template = config.request_template
+        payload = template.copy()
+        payload["messages"] = [template["messages"][0], {"role": "user", "content": text}]
         
         try:
-            response = requests.post(
+            response = await self.post_stream(
                 "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=payload,
+                self.openai_headers,
+                payload,
                 timeout=30
             )
-            response.raise_for_status()
             
-            result = response.json()
-            return result["choices"][0]["message"]["content"].strip()
+            try:
+                async for line in split_lines(response.aiter_bytes()):
+                    # Server-sent events: only "data: " lines carry payloads
+                    if not line.startswith(b"data: "):
+                        continue
+                    data = line[len(b"data: "):]
+                    if data == b"[DONE]":
+                        break
+                    
+                    chunk = orjson.loads(data)
+                    if chunk.get("choices"):
+                        content = chunk["choices"][0].get("delta", {}).get("content")
+                        if content:
+                            yield content
+            finally:
+                await response.aclose()
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"OpenAI API request failed: {e}")
-            if hasattr(e, 'response') and e.response:
+            if isinstance(e, httpx.HTTPStatusError):
                 logger.error(f"Response: {e.response.text}")
             raise BettrWriteError(f"OpenAI API error: {str(e)}")
     
-    def call_ollama_api(self, text: str, config: Dict[str, Any]) -> str:
-        """Call Ollama API"""
-        base_url = self.config.get("settings", {}).get("ollama_base_url", "http://localhost:11434")
-        api_url = f"{base_url}/api/generate"
+    async def call_ollama_api(self, text: str, config: ShortcutConfig) -> AsyncIterator[str]:
+        """Call Ollama API, yielding response tokens as they stream in"""
+        import httpx
         
         # Combine system prompt and user text
-        full_prompt = f"{config.get('prompt', '')}\n\nText to process:\n{text}"
-        
-        payload = {
-            "model": config.get("model", ""),
-            "prompt": full_prompt,
-            "stream": False,
-            **config.get("ollama_options", {})
-        }
+        payload = config.request_template.copy()
+        payload["prompt"] = config.prompt_prefix + text
         
         try:
-            response = requests.post(api_url, json=payload, timeout=60)
-            response.raise_for_status()
+            response = await self.post_stream(self.ollama_url, JSON_HEADERS, payload, timeout=60)
             
-            result = response.json()
-            if "error" in result:
-                raise BettrWriteError(f"Ollama error: {result['error']}")
-                
-            return result.get("response", "").strip()
+            try:
+                async for line in split_lines(response.aiter_bytes()):
+                    if not line:
+                        continue
+                    
+                    chunk = orjson.loads(line)
+                    if "error" in chunk:
+                        raise BettrWriteError(f"Ollama error: {chunk['error']}")
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        break
+            finally:
+                await response.aclose()
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Ollama API request failed: {e}")
             raise BettrWriteError(f"Ollama API error: {str(e)}")
     
     def process_text(self, shortcut_id: str):
         """Main text processing function"""
+        # Held-down or double-pressed hotkeys fire repeatedly
+        now = time.monotonic()
+        if now - self._last_fire.get(shortcut_id, 0) < DEBOUNCE_INTERVAL:
+            return
+        self._last_fire[shortcut_id] = now
+        
         logger.info(f"Processing text for shortcut: {shortcut_id}")
         
         # Find shortcut configuration
-        shortcut_config = None
-        for shortcut in self.config.get("shortcuts", []):
-            if shortcut.get("id") == shortcut_id:
-                shortcut_config = shortcut
-                break
+        shortcut_config = self.shortcut_map.get(shortcut_id)
         
         if not shortcut_config:
             logger.error(f"Shortcut configuration not found: {shortcut_id}")
             self.show_notification("Error", f"Shortcut '{shortcut_id}' not configured")
             return
         
+        # Get selected text
+        selected_text = self.get_selected_text()
+        if not selected_text:
+            self.show_notification("Info", "No text selected")
+            return
+        
+        logger.info(f"Selected text length: {len(selected_text)}")
+        
+        # Coalesce with an identical rewrite that is still running
+        text_digest = hashlib.blake2b(selected_text.encode("utf-8"), digest_size=KEY_DIGEST_SIZE).digest()
+        request_key = (shortcut_id, text_digest)
+        if request_key in self._inflight:
+            logger.info("Identical request already in flight, ignoring")
+            return
+        self._inflight.add(request_key)
+        
+        # Rewrites overlap, so remember where this one's output belongs; a newer
+        # capture or a focus change means the selection it replaces is gone
+        self._captures += 1
+        target = (self._captures, user32.GetForegroundWindow())
+        
+        # Hand the API call off to the event loop so the hotkey returns immediately
+        asyncio.run_coroutine_threadsafe(
+            self.rewrite(shortcut_id, selected_text, shortcut_config, request_key, target), self.loop
+        )
+    
+    async def rewrite(self, shortcut_id: str, selected_text: str, shortcut_config: ShortcutConfig,
+                      request_key: Tuple[str, bytes], target: Tuple[int, Optional[int]]):
+        """Process captured text with the shortcut's backend and replace the selection"""
+        async with self.rewrite_slots:
+            try:
+                # Show processing notification
+                self.notify_in_background("Processing", "Processing text...", timeout=2)
+                
+                # Call appropriate API (or serve from cache) and replace the text
+                if shortcut_config.stream and not shortcut_config.paste:
+                    await self.type_stream(self.backend.stream(shortcut_id, selected_text, shortcut_config), target, selected_text)
+                else:
+                    processed_text = await self.backend.complete(shortcut_id, selected_text, shortcut_config)
+                    async with self.output_lock:
+                        if not self.is_current_target(target):
+                            await self.divert_output(processed_text)
+                        await self.loop.run_in_executor(
+                            None, self.replace_selected_text, processed_text, shortcut_config.paste
+                        )
+                
+                # Show success notification
+                self.notify_in_background("Success", "Text processed and replaced")
+                logger.info("Text processing completed successfully")
+                
+            except BettrWriteError as e:
+                logger.error(f"Processing error: {e}")
+                self.notify_in_background("Error", str(e))
+            except Exception as e:
+                logger.error(f"Unexpected error: {e}", exc_info=True)
+                self.notify_in_background("Error", f"Unexpected error: {str(e)}")
+            finally:
+                self._inflight.discard(request_key)
+    
+    def warm_up_ollama(self):
+        """Load each configured Ollama model in the background before first use"""
+        models = {
+            shortcut.model: shortcut.options.get("keep_alive", OLLAMA_KEEP_ALIVE)
+            for shortcut in self.config.shortcuts
+            if shortcut.backend == "ollama" and shortcut.model
+        }
+        self.warm_models = list(models)
+        for model, keep_alive in models.items():
+            asyncio.run_coroutine_threadsafe(self.load_ollama_model(model, keep_alive), self.loop)
+    
+    async def load_ollama_model(self, model: str, keep_alive: Any):
+        """Ask Ollama to load a model by sending it an empty prompt (keep_alive 0 unloads it)"""
+        import httpx
+        
+        action = "unload" if keep_alive == 0 else "preload"
+        payload = {"model": model, "prompt": "", "keep_alive": keep_alive}
         try:
-            # Get selected text
-            selected_text = self.get_selected_text()
-            if not selected_text:
-                self.show_notification("Info", "No text selected")
-                return
-            
-            logger.info(f"Selected text length: {len(selected_text)}")
-            
-            # Show processing notification
-            self.show_notification("Processing", "Processing text...", timeout=2)
-            
-            # Call appropriate API
-            backend = shortcut_config.get("backend", "openai")
-            
-            if backend == "openai":
-                processed_text = self.call_openai_api(selected_text, shortcut_config)
-            elif backend == "ollama":
-                processed_text = self.call_ollama_api(selected_text, shortcut_config)
-            else:
-                raise BettrWriteError(f"Unknown backend: {backend}")
-            
-            # Replace the text
-            self.replace_selected_text(processed_text)
-            
-            # Show success notification
-            self.show_notification("Success", "Text processed and replaced")
-            logger.info("Text processing completed successfully")
-            
-        except BettrWriteError as e:
-            logger.error(f"Processing error: {e}")
-            self.show_notification("Error", str(e))
+            response = await self.get_client().post(
+                self.ollama_url, headers=JSON_HEADERS, content=orjson.dumps(payload)
+            )
+            response.raise_for_status()
+            logger.info(f"Ollama model {action}ed: {model}")
+        except httpx.HTTPError as e:
+            logger.warning(f"Failed to {action} Ollama model {model}: {e}")
+        except Exception as e:
+            # Nothing waits on this coroutine's result, so log everything
+            logger.warning(f"Failed to {action} Ollama model {model}: {e}", exc_info=True)
+    
+    def unload_ollama_models(self):
+        """Unload the models warm_up_ollama pinned in memory, so they don't outlive bettrWrite"""
+        if not self.warm_models:
+            return
+        
+        async def unload_all():
+            await asyncio.gather(*(self.load_ollama_model(model, 0) for model in self.warm_models))
+        
+        try:
+            asyncio.run_coroutine_threadsafe(unload_all(), self.loop).result(OLLAMA_UNLOAD_TIMEOUT)
         except Exception as e:
-            logger.error(f"Unexpected error: {e}", exc_info=True)
-            self.show_notification("Error", f"Unexpected error: {str(e)}")
+            logger.warning(f"Failed to unload Ollama models: {e}")
     
     def setup_hotkeys(self):
         """Set up keyboard shortcuts"""
-        shortcuts = self.config.get("shortcuts", [])
+        shortcuts = self.config.shortcuts
         
         if not shortcuts:
             logger.error("No shortcuts configured")
@@ -278,14 +1164,14 @@ class BettrWrite:
             return
         
         for shortcut in shortcuts:
-            hotkey = shortcut.get("keys", "").replace(" ", "")
-            shortcut_id = shortcut.get("id")
+            hotkey = shortcut.keys.replace(" ", "")
+            shortcut_id = shortcut.id
             
             try:
                 # Register the hotkey
                 keyboard.add_hotkey(
                     hotkey,
-                    lambda sid=shortcut_id: self.process_text(sid),
+                    partial(self.process_text, shortcut_id),
                     suppress=False
                 )
                 logger.info(f"Registered hotkey: {hotkey} -> {shortcut_id}")
@@ -312,7 +1198,10 @@ class BettrWrite:
     def quit(self):
         """Quit the application"""
         logger.info("BettrWrite shutting down")
+        self.unload_ollama_models()
         self.show_notification("Stopped", "BettrWrite stopped")
+        # os._exit skips atexit, so flush queued log records first
+        log_listener.stop()
         os._exit(0)
 
 
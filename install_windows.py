@@ -8,6 +8,7 @@ import json
 import sys
 import os
 import subprocess
+import shutil
 from pathlib import Path
 import getpass
 
@@ -32,27 +33,57 @@ def install_dependencies():
     
     required_packages = [
         "keyboard",
-        "pyperclip",
-        "pyautogui",
-        "requests",
+        "httpx[http2]",
+        "h2",
+        "orjson",
         "plyer"
     ]
     
-    for package in required_packages:
-        print(f"Installing {package}...")
+    # One resolver run for everything; uv is much faster when it's available,
+    # but it has no --user fallback, so pip is still tried if it fails
+    commands = []
+    uv = shutil.which("uv")
+    if uv:
+        commands.append([uv, "pip", "install", "--python", sys.executable, *required_packages])
+    commands.append([sys.executable, "-m", "pip", "install",
+                     "--disable-pip-version-check", "--no-input", *required_packages])
+    
+    print(f"Installing {', '.join(required_packages)}...")
+    for command in commands:
         try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-            print_colored(f"✓ {package} installed successfully", Colors.GREEN)
+            subprocess.check_call(command)
+            break
         except subprocess.CalledProcessError:
-            print_colored(f"✗ Failed to install {package}", Colors.RED)
-            return False
+            if command is commands[-1]:
+                print_colored("✗ Package installation failed", Colors.RED)
+            else:
+                print_colored("✗ uv install failed, retrying with pip", Colors.YELLOW)
+    
+    # Report each package, since a single install can partially succeed. Ask a
+    # fresh interpreter, since a --user install may not be on this one's sys.path
+    installed = True
+    for package in required_packages:
+        name = package.split("[")[0]
+        result = subprocess.run([sys.executable, "-m", "pip", "show", name],
+                                capture_output=True, text=True)
+        versions = [line.split(":", 1)[1].strip() for line in result.stdout.splitlines()
+                    if line.startswith("Version:")]
+        if result.returncode == 0 and versions:
+            print_colored(f"✓ {name} {versions[0]} installed", Colors.GREEN)
+        else:
+            print_colored(f"✗ Failed to install {name}", Colors.RED)
+            installed = False
+    
+    if not installed:
+        return False
     
     # Optional: Install pywin32 for desktop shortcuts
     print_colored("\nOptional: Install pywin32 for desktop shortcuts?", Colors.YELLOW)
     install_pywin32 = input("Install pywin32? (y/N): ").lower()
     if install_pywin32 == 'y':
         try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", "pywin32"])
+            subprocess.check_call([sys.executable, "-m", "pip", "install",
+                                   "--disable-pip-version-check", "--no-input", "pywin32"])
             print_colored("✓ pywin32 installed successfully", Colors.GREEN)
         except subprocess.CalledProcessError:
             print_colored("✗ Failed to install pywin32 - shortcuts will be created without icons", Colors.YELLOW)
@@ -102,8 +133,8 @@ def configure_ollama():
     # Test connection
     print("Testing Ollama connection...")
     try:
-        import requests
-        response = requests.get(f"{base_url}/api/tags", timeout=5)
+        import httpx
+        response = httpx.get(f"{base_url}/api/tags", timeout=5)
         if response.status_code == 200:
             print_colored("✓ Ollama server is accessible", Colors.GREEN)
             
@@ -125,6 +156,11 @@ def configure_ollama():
         print_colored("No model specified. You'll need to configure it later.", Colors.YELLOW)
         model = ""
     
+    print_colored("\nTip: bettrWrite keeps Ollama models loaded while it runs and unloads them when you quit it.", Colors.BLUE)
+    print("If your shortcuts use several models, set these on the Ollama server so they stay resident:")
+    print("  OLLAMA_MAX_LOADED_MODELS - number of models kept in memory at once")
+    print("  OLLAMA_NUM_PARALLEL      - number of requests each model serves concurrently")
+    
     return base_url, model
 
 
@@ -267,14 +303,14 @@ def main():
     print("This will install bettrWrite with AI text processing capabilities.")
     
     # Check Python version
-    if sys.version_info < (3, 7):
-        print_colored("Python 3.7 or higher is required!", Colors.RED)
+    if sys.version_info < (3, 8):
+        print_colored("Python 3.8 or higher is required!", Colors.RED)
         sys.exit(1)
     
     # Install dependencies
     if not install_dependencies():
         print_colored("\nFailed to install dependencies. Please install manually:", Colors.RED)
-        print("pip install keyboard pyperclip pyautogui requests plyer")
+        print('pip install keyboard "httpx[http2]" h2 orjson plyer')
         sys.exit(1)
     
     # Create configuration
@@ -289,7 +325,6 @@ def main():
     print_colored("\nInstalling main script...", Colors.YELLOW)
     main_script = Path("bettrwrite_windows.py")
     if main_script.exists():
-        import shutil
         shutil.copy(main_script, config_dir / "bettrwrite_windows.py")
         print_colored("✓ Main script installed", Colors.GREEN)
     else:
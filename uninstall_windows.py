@@ -89,7 +89,7 @@ def main():
     print_colored("\n=== Uninstallation Complete ===", Colors.GREEN)
     
     print("\nPython packages were not removed. To remove them manually, run:")
-    print("pip uninstall keyboard pyperclip pyautogui plyer requests")
+    print("pip uninstall keyboard httpx orjson plyer pyperclip pyautogui requests")
     
     input("\nPress Enter to exit...")
 